@@ -8,8 +8,18 @@ import os
 import subprocess
 import copy
 import sys
+import threading
+import base64
+import binascii
+import time
+import atexit
 from abc import ABCMeta, abstractmethod
 
+try:
+    import urllib.request as urllib_request
+except ImportError:
+    import urllib2 as urllib_request
+
 #-----[ Constants ]------------------------------------------------
 PLUGIN_NAME = "NemoRcloneSyncProvider"
 PLUGIN_TITLE = "Nemo Rclone Sync"
@@ -25,6 +35,7 @@ RCLONE = "rclone"
 RCLONE_SYNC = "/usr/local/bin/rclonesync"
 RCLONE_SYNC_FILTERS_FILE = "/tmp/rclonesync-filters"
 RCLONE_SYNC_FILTERS_FILE_CONTENTS = "- .rclonesync/"
+RCLONE_RCD = False #Set to True to run rclone operations and syncs through one shared "rclone rcd" (rclone >= 1.55)
 
 DEBUG = False
 
@@ -97,7 +108,7 @@ class GAsyncSpawn(GObject.GObject):
         self._stdoutWatch = None
         self._stderrWatch = None
 
-    def run(self, cmd):
+    def run(self, cmd, env=None):
         if self._is_running:
             raise Exception("Process is already running")
             return False
@@ -108,7 +119,7 @@ class GAsyncSpawn(GObject.GObject):
         #self.ferr = os.fdopen(p.stderr, "r")
 
         #Open the process with pipes for IO
-        self._p = subprocess.Popen(cmd, stdout=subprocess.PIPE,stderr=subprocess.PIPE)
+        self._p = subprocess.Popen(cmd, stdout=subprocess.PIPE,stderr=subprocess.PIPE,env=env)
 
         GLib.child_watch_add(self._p.pid,self._on_done)
         self._stdoutWatch = GLib.io_add_watch(self._p.stdout, GLib.IO_IN, self._on_stdout)
@@ -329,6 +340,145 @@ class LocalPathBrowserProvider(PathBrowserProvider):
 
         self.emit('mkdir-done', path, success)
 
+#-----[ Rclone Remote Control ]-------------------------------------
+
+#With RCLONE_RCD set, a single "rclone rcd" is started on first use
+#and shared by the remote browsers and by every sync (rclonesync
+#--rcd-url), rather than running a new rclone, which re-reads the
+#rclone config and reconnects to the remote, for every operation.
+
+class RcloneRcd:
+    def __init__(self):
+        self._p = None
+        self._ready = False #True once the rcd answers
+        self.url = None
+        self.user = "nemorclonesync"
+        self.password = None
+        self._opener = urllib_request.build_opener(urllib_request.ProxyHandler({})) #Never via an http_proxy
+        self._lock = threading.Lock()
+
+    def running(self):
+        return self._ready and self._p is not None and self._p.poll() is None
+
+    def start(self):
+        #Returns True if the rcd is running, starting it if needed.  This can take
+        #up to 10 seconds, so it is called from worker threads, not the GTK thread
+        with self._lock:
+            return self._start()
+
+    def start_async(self):
+        #Starts the rcd in a thread, so it is running for later calls
+        t = threading.Thread(target=self.start)
+        t.daemon = True
+        t.start()
+
+    def _start(self):
+        if self.running():
+            return True
+
+        #Pick a free port, and a password for this session
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        self.url = "http://127.0.0.1:" + str(port) + "/"
+        self.password = binascii.hexlify(os.urandom(16)).decode("ascii")
+
+        try:
+            devnull = open(os.devnull, "wb")
+            self._p = subprocess.Popen([RCLONE, "rcd", "--rc-addr", "127.0.0.1:" + str(port)], env=self.env(), stdout=devnull, stderr=devnull)
+        except Exception as e:
+            if DEBUG: print(PLUGIN_NAME, ":: Cannot start rclone rcd:", e)
+            self._p = None
+            return False
+
+        #Wait for it to answer
+        for i in range(100):
+            try:
+                self.call("rc/noop")
+                self._ready = True
+                return True
+            except Exception:
+                if self._p.poll() is not None:
+                    break
+                time.sleep(0.1)
+
+        if DEBUG: print(PLUGIN_NAME, ":: rclone rcd did not start")
+        self.stop()
+        return False
+
+    def env(self):
+        #Environment for a process that logs in to the rcd (rclone rcd itself, or rclonesync --rcd-url)
+        env = dict(os.environ)
+        env["RCLONE_RC_USER"] = self.user
+        env["RCLONE_RC_PASS"] = self.password
+        return env
+
+    def call(self, method, params=None):
+        #Blocking rc call.  Returns the result dictionary, or raises an Exception with rclone's error message
+        request = urllib_request.Request(self.url + method, json.dumps(params or {}).encode("utf-8"), {"Content-Type": "application/json"})
+        auth = base64.b64encode((self.user + ":" + self.password).encode("utf-8")).decode("ascii")
+        request.add_header("Authorization", "Basic " + auth)
+        try:
+            response = self._opener.open(request, timeout=30)
+        except urllib_request.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode("utf-8")).get("error")
+            except ValueError:
+                message = None
+            raise Exception(message or "HTTP error " + str(e.code))
+        return json.loads(response.read().decode("utf-8"))
+
+    def stop(self):
+        self._ready = False
+        if self._p and self._p.poll() is None:
+            self._p.terminate()
+            self._p.wait()
+        self._p = None
+
+RCD = RcloneRcd()
+atexit.register(RCD.stop)
+
+#-----[ Async Rclone Remote Control Call ]--------------------------
+
+#This class makes an rc call to the shared rclone rcd in a thread, so
+#the UI is not blocked.  The rcd is started first if needed, also in
+#the thread.  Once the call completes, a signal is emitted (from the
+#main loop) with the result dictionary (None on failure) and the error
+#message, RCD_START_FAILED if the rcd could not be started.
+
+RCD_START_FAILED = "rclone rcd did not start"
+
+class AsyncRcdCall(GObject.GObject):
+    __gsignals__ = {
+        'call-done' : (GObject.SIGNAL_RUN_LAST, GObject.TYPE_NONE,
+                            (GObject.TYPE_PYOBJECT, GObject.TYPE_STRING)),
+    }
+
+    def __init__(self):
+        GObject.GObject.__init__(self)
+
+    def run(self, method, params):
+        t = threading.Thread(target=self._call, args=(method, params))
+        t.daemon = True
+        t.start()
+        return True
+
+    def _call(self, method, params):
+        try:
+            if not RCD.start():
+                raise Exception(RCD_START_FAILED)
+            result = RCD.call(method, params)
+            error = ""
+        except Exception as e:
+            result = None
+            error = str(e)
+        GLib.idle_add(self._on_done, result, error)
+
+    def _on_done(self, result, error):
+        self.emit("call-done", result, error)
+        return False #Run once
+
 #-----[ Rclone Path Browser Provider ]------------------------------
 class RclonePathBrowserProvider(PathBrowserProvider):
     def __init__(self, remote):
@@ -339,6 +489,10 @@ class RclonePathBrowserProvider(PathBrowserProvider):
         self.run2 = AsyncRun()
         self.run1.connect('process-done', self._on_run1_done)
         self.run2.connect('process-done', self._on_run2_done)
+        self.call1 = AsyncRcdCall()
+        self.call2 = AsyncRcdCall()
+        self.call1.connect('call-done', self._on_call1_done)
+        self.call2.connect('call-done', self._on_call2_done)
 
         self.getPathContentsPath = None
         self.mkdirPath = None
@@ -349,15 +503,21 @@ class RclonePathBrowserProvider(PathBrowserProvider):
         if not self.getPathContentsPath:
             self.getPathContentsPath = path
 
-            #Run the rclone "list directories" command with a 5 second timeout
-            #The lsf command was added in rclone 1.48 and outputs files/folders in an easy-to-parse format
             try:
-                return self.run1.run([RCLONE,'lsf',"--contimeout=5s","--dirs-only",str(path)])
+                if RCLONE_RCD:
+                    #List the directories through the shared rclone rcd
+                    return self.call1.run("operations/list", {"fs": self.remote + ":", "remote": self._remote_path(path), "opt": {"dirsOnly": True}})
+                return self._run_lsf(path)
             except Exception as e:
                 self.lastError = str(e)
                 return False
         else:
             return False
+
+    def _run_lsf(self, path):
+        #Run the rclone "list directories" command with a 5 second timeout
+        #The lsf command was added in rclone 1.48 and outputs files/folders in an easy-to-parse format
+        return self.run1.run([RCLONE,'lsf',"--contimeout=5s","--dirs-only",str(path)])
         
 
     def _on_run1_done(self, sender, retval, stdout, stderr):
@@ -378,6 +538,31 @@ class RclonePathBrowserProvider(PathBrowserProvider):
         #Reset "flag" to allow function to be called again
         self.getPathContentsPath = None
 
+    def _on_call1_done(self, sender, result, error):
+        if error == RCD_START_FAILED:
+            #No rcd - run rclone instead
+            try:
+                if self._run_lsf(self.getPathContentsPath):
+                    return
+            except Exception as e:
+                error = str(e)
+
+        dirs = None
+
+        if result is not None: #Success
+            dirs = [item["Name"] for item in result.get("list", [])]
+        else:
+            self.lastError = error
+
+        self.emit('get-path-contents-done', self.getPathContentsPath, dirs)
+
+        #Reset "flag" to allow function to be called again
+        self.getPathContentsPath = None
+
+    def _remote_path(self, path):
+        #Path within the remote, without the "remote:" prefix
+        return str(path)[len(self.remote) + 1:]
+
     def get_root_path(self):
         return FolderPath(self.remote + ":")
 
@@ -389,13 +574,18 @@ class RclonePathBrowserProvider(PathBrowserProvider):
             self.mkdirPath = path
 
             try:
-                #Run the rclone "mkdir" command with a 5 second timeout
-                return self.run2.run([RCLONE,'mkdir',"--contimeout=5s",str(path)])
-            except Exception as e:
+                if RCLONE_RCD:
+                    return self.call2.run("operations/mkdir", {"fs": self.remote + ":", "remote": self._remote_path(path)})
+                return self._run_mkdir(path)
+            except Exception:
                 return False
         else:
             return False
 
+    def _run_mkdir(self, path):
+        #Run the rclone "mkdir" command with a 5 second timeout
+        return self.run2.run([RCLONE,'mkdir',"--contimeout=5s",str(path)])
+
     def _on_run2_done(self, sender, retval, stdout, stderr):
         if retval != 0:
             self.lastError = stderr
@@ -404,6 +594,22 @@ class RclonePathBrowserProvider(PathBrowserProvider):
 
         self.mkdirPath = None
 
+    def _on_call2_done(self, sender, result, error):
+        if error == RCD_START_FAILED:
+            #No rcd - run rclone instead
+            try:
+                if self._run_mkdir(self.mkdirPath):
+                    return
+            except Exception as e:
+                error = str(e)
+
+        if result is None:
+            self.lastError = error
+
+        self.emit('mkdir-done', self.mkdirPath, result is not None)
+
+        self.mkdirPath = None
+
     def error(self):
         return self.lastError
 
@@ -678,6 +884,14 @@ class NemoRcloneSyncProviderDialog(Gtk.Dialog):
                 self.pathBrowserWidget.set_path_provider(provider)
 
     def rclone_get_remotes(self):
+        if RCLONE_RCD and not RCD.running():
+            RCD.start_async() #For the remote browsers, and rclone listremotes this time
+        elif RCLONE_RCD:
+            try:
+                return RCD.call("config/listremotes").get("remotes") or []
+            except Exception as e:
+                if DEBUG: print(PLUGIN_NAME, ":: rclone rcd config/listremotes failed:", e)
+
         out = subprocess.Popen([RCLONE,'listremotes'], stdout=subprocess.PIPE,stderr=subprocess.STDOUT)
         stdout,stderr = out.communicate()
 
@@ -878,6 +1092,17 @@ class NemoRcloneSyncProvider(GObject.GObject, Nemo.MenuProvider, Nemo.NameAndDes
         args.append("--verbose")
         args.append("--filters-file")
         args.append(RCLONE_SYNC_FILTERS_FILE)
+        env = None
+        if RCLONE_RCD and RCD.running():
+            #Let rclonesync use the shared rclone rcd
+            args.append("--rcd-url")
+            args.append(RCD.url)
+            env = RCD.env()
+        elif RCLONE_RCD:
+            #rclonesync starts an rcd of its own this time, and the shared
+            #one is started in the background for the next syncs
+            args.append("--rcd")
+            RCD.start_async()
         args.append(folder2)
         args.append(folder1)
 
@@ -896,7 +1121,7 @@ class NemoRcloneSyncProvider(GObject.GObject, Nemo.MenuProvider, Nemo.NameAndDes
 
         #Execute rclonesync
         try:
-            self.spawn.run(args)
+            self.spawn.run(args, env)
         except Exception as e:
             self.syncDialog.print_line("ERROR: " + str(e) + "\n")
             self.syncDialog.set_ok_enabled(True)
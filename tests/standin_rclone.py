@@ -0,0 +1,273 @@
+"""Stand-in for rclone in the tests:  the rclone commands rclonesync runs, on local paths only.
+
+Listing and transfer follow rclone's behaviour closely enough for rclonesync:  lsl/md5sum output, filters (--filter,
+--filter-from, --exclude, --exclude-from, --files-from), copy/sync skipping files of the same size and modtime, and
+--use-json-log logs naming each file copied, deleted or failed.  Environment variables set its behaviour:
+    RCLONE_STANDIN_LOG          File to append each call's arguments to, as a JSON list per line
+    RCLONE_STANDIN_FAIL         Copies and deletes of files whose path contains one of these (comma separated) fail...
+    RCLONE_STANDIN_FAIL_TIMES   ...this many times in all (default always), counted in RCLONE_STANDIN_LOG + '.fails'
+    RCLONE_STANDIN_FAIL_CODE    with this exit code (default 1)
+    RCLONE_STANDIN_KILL         A copy of a file whose path contains this kills the calling rclonesync first (SIGKILL)
+    RCLONE_STANDIN_UNRUNNABLE   After a call of this command, rclone can't be run any more (not executable)
+    RCLONE_STANDIN_REMOTES      Remotes, as JSON {name: {"type": backend type, "root": local folder, "across": bool}},
+                                "across" for the backend feature ServerSideAcrossConfigs
+RCLONE, the path of the wrapper script the tests run as rclone, is set by the wrapper.
+"""
+from __future__ import print_function
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import signal
+import sys
+import time
+
+fsencode = getattr(os, 'fsencode', lambda path: path)
+REMOTES = json.loads(os.environ.get('RCLONE_STANDIN_REMOTES', '{}'))
+WITH_VALUE = {'--config', '--filter', '--filter-from', '--exclude', '--exclude-from', '--include', '--files-from',
+              '--log-file', '--log-level', '--log-format', '--min-size', '--stats', '--stats-log-level', '--timeout'}
+
+
+def glob_regex(pattern):
+    """rclone filter glob to regex:  a leading / anchors to the root, * and ? stay within a path segment, ** doesn't,
+    {a,b} are alternatives.  A pattern ending in / matches directories (given with a trailing /)."""
+    anchored = pattern.startswith('/')
+    out, i = [], 0
+    pattern = pattern.lstrip('/')
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '{':
+            end = pattern.index('}', i)
+            out.append('(' + '|'.join(re.escape(alt) for alt in pattern[i + 1:end].split(',')) + ')')
+            i = end
+        elif c == '\\' and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile(('^' if anchored else '(^|/)') + ''.join(out) + '$')
+
+
+class Filters(object):
+    def __init__(self):
+        self.rules = []                             # (include, regex, directory rule)
+        self.excludes = []                          # --exclude-from rules, applied first
+
+    def add(self, rule, excludes=False):
+        rule = rule.rstrip('\n')
+        if not rule.strip() or rule.startswith(('#', ';')):
+            return
+        if rule == '!':
+            del self.rules[:]
+            return
+        include, pattern = (rule[0] == '+', rule[2:]) if rule[:2] in ('+ ', '- ') else (False, rule)
+        (self.excludes if excludes else self.rules).append((include, glob_regex(pattern), pattern.endswith('/')))
+
+    def included(self, key):
+        dirs = ['/'.join(key.split('/')[:n]) + '/' for n in range(1, key.count('/') + 1)]
+        for dir_ in dirs:                           # Directory rules apply to everything under the directory
+            for include, regex, dir_rule in self.excludes + self.rules:
+                if dir_rule and regex.search(dir_):
+                    if not include:
+                        return False
+                    break
+        for include, regex, dir_rule in self.excludes + self.rules:
+            if not dir_rule and regex.search(key):
+                return include
+        return True
+
+
+def parse(argv):
+    cmd, args = argv[0], argv[1:]
+    opts, paths, filters = {}, [], Filters()
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in WITH_VALUE:
+            value = args[i + 1]
+            i += 2
+            if arg == '--filter':
+                filters.add(value)
+            elif arg == '--include':
+                filters.add('+ ' + value)
+            elif arg == '--exclude':
+                filters.add('- ' + value, excludes=True)
+            elif arg in ('--filter-from', '--exclude-from'):
+                with io.open(value, encoding='utf8') as f:
+                    for line in f:
+                        filters.add(line if arg == '--filter-from' else '- ' + line.rstrip('\n'), excludes=arg == '--exclude-from')
+            else:
+                opts[arg] = value
+        elif arg.startswith('-'):
+            opts[arg] = True
+            i += 1
+        else:
+            paths.append(arg)
+            i += 1
+    return cmd, opts, paths, filters
+
+
+class Rclone(object):
+    def __init__(self, argv):
+        self.cmd, self.opts, self.remote_paths, self.filters = parse(argv)
+        self.paths = [self.local(path) for path in self.remote_paths]
+        self.log_file = self.opts.get('--log-file') if '--use-json-log' in self.opts else None
+        self.files_from = None
+        if '--files-from' in self.opts:
+            with io.open(self.opts['--files-from'], encoding='utf8') as f:
+                self.files_from = [line.rstrip('\n') for line in f if line.strip() and not line.startswith(('#', ';'))]
+
+    def local(self, path):
+        remote = path.split(':')[0] if ':' in path else None
+        if remote not in REMOTES:
+            return path
+        return os.path.join(REMOTES[remote]['root'], path.split(':', 1)[1].lstrip('/'))
+
+    def server_side(self):
+        """True if this copy is between remotes that rclone would copy between server-side."""
+        remotes = [path.split(':')[0] for path in self.remote_paths[:2] if path.split(':')[0] in REMOTES]
+        return (len(remotes) == 2 and REMOTES[remotes[0]]['type'] == REMOTES[remotes[1]]['type']
+                and (remotes[0] == remotes[1] or '--server-side-across-configs' in self.opts))
+
+    def log(self, level, key, msg):
+        if self.log_file:
+            with io.open(self.log_file, 'a', encoding='utf8') as f:
+                f.write(json.dumps({'level': level, 'msg': msg, 'object': key}) + u'\n')
+
+    def keys(self, base):
+        if self.files_from is not None:
+            return [key for key in self.files_from if os.path.isfile(os.path.join(base, key))]
+        keys = []
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                key = os.path.relpath(os.path.join(dirpath, name), base).replace(os.sep, '/')
+                if self.filters.included(key):
+                    keys.append(key)
+        return sorted(keys)
+
+    def fails(self, path):
+        patterns = os.environ.get('RCLONE_STANDIN_FAIL')
+        if not patterns or not any(pattern in path for pattern in patterns.split(',')):
+            return False
+        times = os.environ.get('RCLONE_STANDIN_FAIL_TIMES')
+        if times is None:
+            return True
+        counter = os.environ['RCLONE_STANDIN_LOG'] + '.fails'
+        count = int(io.open(counter).read()) if os.path.exists(counter) else 0
+        with io.open(counter, 'w') as f:
+            f.write(u'{}'.format(count + 1))
+        return count < int(times)
+
+    def copy(self, src, dest, key):
+        if os.environ.get('RCLONE_STANDIN_KILL') and os.environ['RCLONE_STANDIN_KILL'] in src:
+            os.kill(os.getppid(), signal.SIGKILL)
+        if self.fails(src):
+            self.log('error', key, 'Failed to copy: stand-in failure')
+            return False
+        if '--dry-run' not in self.opts:
+            if not os.path.isdir(os.path.dirname(dest)):
+                os.makedirs(os.path.dirname(dest))
+            existed = os.path.exists(dest)
+            shutil.copy2(src, dest)
+            if self.server_side():
+                self.log('info', key, 'Copied (server-side copy)')
+            else:
+                self.log('info', key, 'Copied (replaced existing)' if existed else 'Copied (new)')
+        return True
+
+    def delete(self, path, key):
+        if self.fails(path):
+            self.log('error', key, "Couldn't delete: stand-in failure")
+            return False
+        if '--dry-run' not in self.opts:
+            os.remove(path)
+            self.log('info', key, 'Deleted')
+        return True
+
+    def run(self):
+        cmd, paths = self.cmd, self.paths
+        if cmd in ('lsl', 'md5sum'):
+            if not os.path.isdir(paths[0]):
+                return 3
+            out = getattr(sys.stdout, 'buffer', sys.stdout)
+            for key in self.keys(paths[0]):
+                path = os.path.join(paths[0], key)
+                if cmd == 'md5sum':
+                    with io.open(path, 'rb') as f:
+                        line = '{}  {}\n'.format(hashlib.md5(f.read()).hexdigest(), key)
+                else:
+                    st = os.stat(path)
+                    ns = int(round(st.st_mtime * 1e9))
+                    line = '{:9} {}.{:09} {}\n'.format(st.st_size, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ns // 10**9)),
+                                                      ns % 10**9, key)
+                out.write(fsencode(line))       # File names as they are on disk, UTF-8 or not
+            return 0
+        if cmd in ('copyto', 'moveto'):
+            if not os.path.isfile(paths[0]):
+                return 4
+            if not self.copy(paths[0], paths[1], os.path.basename(paths[1])):
+                return int(os.environ.get('RCLONE_STANDIN_FAIL_CODE', 1))
+            if cmd == 'moveto' and '--dry-run' not in self.opts:
+                os.remove(paths[0])
+            return 0
+        if cmd == 'delete' and os.path.isfile(paths[0]):
+            return 0 if self.delete(paths[0], os.path.basename(paths[0])) else int(os.environ.get('RCLONE_STANDIN_FAIL_CODE', 1))
+        if cmd in ('copy', 'sync', 'delete'):
+            failed = False
+            if cmd != 'delete':
+                for key in self.keys(paths[0]):
+                    src, dest = os.path.join(paths[0], key), os.path.join(paths[1], key)
+                    if (os.path.exists(dest) and '--ignore-times' not in self.opts and os.path.getsize(src) == os.path.getsize(dest)
+                            and int(os.stat(src).st_mtime) == int(os.stat(dest).st_mtime)):
+                        continue
+                    failed |= not self.copy(src, dest, key)
+            if cmd != 'copy':
+                base = paths[1] if cmd == 'sync' else paths[0]
+                keep = set(self.keys(paths[0])) if cmd == 'sync' else set()
+                for key in self.keys(base):
+                    if key not in keep:
+                        failed |= not self.delete(os.path.join(base, key), key)
+            return int(os.environ.get('RCLONE_STANDIN_FAIL_CODE', 1)) if failed else 0
+        if cmd == 'rmdirs':
+            if not os.path.isdir(paths[0]):
+                return 3
+            for dirpath, _, _ in sorted(os.walk(paths[0]), reverse=True):
+                if (dirpath != paths[0].rstrip('/') or '--leave-root' not in self.opts) and not os.listdir(dirpath):
+                    os.rmdir(dirpath)
+            return 0
+        if cmd == 'listremotes':
+            for name in sorted(REMOTES):
+                print(name + ':' + ('  ' + REMOTES[name]['type'] if '--long' in self.opts else ''))
+            return 0
+        if cmd == 'backend' and paths[0] == 'features':
+            remote = self.remote_paths[1].split(':')[0]
+            print(json.dumps({'Name': remote, 'Root': self.remote_paths[1].split(':', 1)[1],
+                              'Features': {'Copy': True, 'Move': True, 'ServerSideAcrossConfigs': REMOTES[remote].get('across', False)}}))
+            return 0
+        sys.stderr.write('rclone stand-in: unsupported command {}\n'.format(cmd))
+        return 1
+
+
+def main():
+    if os.environ.get('RCLONE_STANDIN_LOG'):
+        with io.open(os.environ['RCLONE_STANDIN_LOG'], 'a', encoding='utf8') as f:
+            f.write(json.dumps(sys.argv[1:]) + u'\n')
+    status = Rclone(sys.argv[1:]).run()
+    if os.environ.get('RCLONE_STANDIN_UNRUNNABLE') == sys.argv[1]:
+        os.chmod(RCLONE, 0o644)
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Shared by the tests:  the rclonesync engine loaded as a module, and SyncTestCase running it on two local folders
+with tests/standin_rclone.py for rclone.
+"""
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+ENGINE = os.path.join(TESTS, '..', 'source', 'rclonesync')
+
+WRAPPER = '''#!{python}
+import runpy
+runpy.run_path({standin!r}, {{'RCLONE': __file__}}, run_name='__main__')
+'''
+
+
+def load_engine():
+    """The rclonesync engine's globals, run as a module (its __main__ block skipped)."""
+    engine = {'__name__': 'rclonesync'}
+    exec(compile(open(ENGINE).read(), ENGINE, 'exec'), engine)
+    return engine
+
+
+class SyncTestCase(unittest.TestCase):
+    """Path1 and Path2 folders, a workdir and a stand-in rclone in a temp dir, removed after each test."""
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='rclonesync_test_')
+        self.path1, self.path2, self.workdir = [os.path.join(self.tmp, name) for name in ('path1', 'path2', 'workdir')]
+        os.makedirs(self.path1)
+        os.makedirs(self.path2)
+        self.log = os.path.join(self.tmp, 'rclone.log')
+        self.rclone = os.path.join(self.tmp, 'rclone')
+        with io.open(self.rclone, 'w') as f:
+            f.write(WRAPPER.format(python=sys.executable, standin=os.path.join(TESTS, 'standin_rclone.py')))
+        os.chmod(self.rclone, 0o755)
+        self.config = os.path.join(self.tmp, 'rclone.conf')
+        io.open(self.config, 'w').close()
+        self.mtime = int(time.time()) - 3600
+        self.sync_paths = [self.path1, self.path2]  # As given to rclonesync
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path, key, data, age=0):
+        """Write a file, with a modtime <age> seconds after the test's first files."""
+        full = os.path.join(path, key)
+        if not os.path.isdir(os.path.dirname(full)):
+            os.makedirs(os.path.dirname(full))
+        with io.open(full, 'w', encoding='utf8') as f:
+            f.write(data)
+        os.utime(full, (self.mtime + age, self.mtime + age))
+
+    def read(self, path, key):
+        with io.open(os.path.join(path, key), encoding='utf8') as f:
+            return f.read()
+
+    def files(self, path):
+        return sorted(os.path.relpath(os.path.join(dirpath, name), path).replace(os.sep, '/')
+                      for dirpath, _, names in os.walk(path) for name in names)
+
+    def run_sync(self, *args, **env):
+        """Run rclonesync on Path1 and Path2 with the args, and the environment variables for the stand-in rclone.
+        Returns the exit code and the output, and starts a new log of the rclone calls."""
+        if os.path.exists(self.log):
+            os.remove(self.log)
+        environ = dict(os.environ, RCLONE_STANDIN_LOG=self.log, **env)
+        process = subprocess.Popen([sys.executable, ENGINE] + self.sync_paths + ['--workdir', self.workdir,
+                                    '--rclone', self.rclone, '--config', self.config, '--no-datetime-log'] + list(args),
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=environ)
+        output = process.communicate()[0].decode('utf8', 'replace')
+        return process.returncode, output
+
+    def remove_lock(self):
+        """Remove the lock file left by a killed run."""
+        paths = (self.path1 + '/' + self.path2 + '/').replace(':', '_').replace('/', '_').replace('\\', '_')
+        lock_file = os.path.join(tempfile.gettempdir(), 'rclonesync_LOCK_' + paths)
+        if os.path.exists(lock_file):
+            os.remove(lock_file)
+
+    def call_paths(self, call):
+        """The Path1 and Path2 paths an rclone call was given."""
+        return [arg for arg in call if arg.startswith((self.path1 + '/', self.path2 + '/'))]
+
+    def rclone_calls(self, cmd=None):
+        """The rclone calls of the last run, as argument lists."""
+        if not os.path.exists(self.log):
+            return []
+        with io.open(self.log, encoding='utf8') as f:
+            calls = [json.loads(line) for line in f]
+        return [call for call in calls if cmd is None or call[0] == cmd]
@@ -0,0 +1,108 @@
+"""Tests of --check-access runs with a stand-in rclone whose check file listing is quiet for a while, as a filtered
+listing of a large tree is while rclone walks the excluded files.
+
+    python -m unittest discover tests
+"""
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'source', 'rclonesync')
+
+# Lists local directories as rclone lsl does, with --filter rules, and logs its arguments.  Any other command succeeds
+# without doing anything, which is enough for paths that are already in sync.
+STAND_IN_RCLONE = r'''#!{python}
+import fnmatch, io, os, sys, time
+args = sys.argv[1:]
+with io.open({log!r}, 'a', encoding='utf8') as f:
+    f.write(u' '.join(args) + u'\n')
+if args[0] != 'lsl':
+    sys.exit(0)
+root, filters = args[1], []
+for i, arg in enumerate(args):
+    if arg == '--filter':
+        filters.append((args[i + 1][0], args[i + 1][2:].lstrip('/')))
+def included(key):
+    for action, pattern in filters:
+        if (key + '/').startswith(pattern) if pattern.endswith('/') else fnmatch.fnmatch(os.path.basename(key), pattern):
+            return action == '+'
+    return True
+if filters:
+    time.sleep({quiet})                             # Walking the excluded files, with nothing to output
+for dirpath, dirnames, filenames in os.walk(root):
+    for name in sorted(filenames):
+        path = os.path.join(dirpath, name)
+        key = os.path.relpath(path, root).replace(os.sep, '/')
+        if included(key):
+            st = os.stat(path)
+            print('{{:9}} {{}}.000000000 {{}}'.format(st.st_size, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(int(st.st_mtime))), key))
+'''
+
+QUIET = 3                                           # Seconds the check file listing is silent
+
+
+class TestCheckAccess(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='rclonesync_test_')
+        self.path1, self.path2, self.workdir = [os.path.join(self.tmp, name) for name in ('path1', 'path2', 'workdir')]
+        mtime = time.time() - 3600
+        for path in (self.path1, self.path2):
+            os.makedirs(os.path.join(path, 'sub'))
+            for key in ('RCLONE_TEST', 'a.txt', 'sub/b.txt'):
+                with io.open(os.path.join(path, key), 'w') as f:
+                    f.write(u'data ' + key)
+                os.utime(os.path.join(path, key), (mtime, mtime))
+        self.log = os.path.join(self.tmp, 'rclone.log')
+        self.rclone = os.path.join(self.tmp, 'rclone')
+        with io.open(self.rclone, 'w') as f:
+            f.write(STAND_IN_RCLONE.format(python=sys.executable, log=self.log, quiet=QUIET))
+        os.chmod(self.rclone, 0o755)
+        self.config = os.path.join(self.tmp, 'rclone.conf')
+        io.open(self.config, 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def run_sync(self, *args):
+        process = subprocess.Popen([sys.executable, ENGINE, self.path1, self.path2, '--workdir', self.workdir,
+                                    '--rclone', self.rclone, '--config', self.config,
+                                    '--local-scan', 'rclone', '--no-datetime-log'] + list(args),
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        output = process.communicate()[0].decode('utf8', 'replace')
+        return process.returncode, output
+
+    def rclone_calls(self, cmd=None):
+        with io.open(self.log, encoding='utf8') as f:
+            return [line.split() for line in f if cmd is None or line.startswith(cmd + ' ')]
+
+    def test_quiet_check_listing(self):
+        returncode, output = self.run_sync('--first-sync')
+        self.assertEqual(returncode, 0, output)
+        start = time.time()
+        returncode, output = self.run_sync('--check-access', '--verbose')
+        self.assertEqual(returncode, 0, output)
+        self.assertIn('Checking Path1 and Path2 rclone filesystems access health', output)
+        self.assertNotIn('ERROR', output)
+        self.assertGreaterEqual(time.time() - start, QUIET)
+        checks = [call for call in self.rclone_calls('lsl') if '--filter' in call]
+        self.assertEqual(len(checks), 2)            # Each path listed once - not stopped and retried
+
+    def test_default_rclone_options(self):
+        # With no --stall-timeout, no rclone stats are asked for, and listings are left to log as rclone does
+        returncode, output = self.run_sync('--first-sync')
+        self.assertEqual(returncode, 0, output)
+        self.assertTrue([call for call in self.rclone_calls() if call[0] != 'lsl'])
+        for call in self.rclone_calls():
+            self.assertNotIn('--stats', call)
+        for call in self.rclone_calls('lsl'):
+            self.assertNotIn('--use-json-log', call)
+            self.assertNotIn('--log-file', call)
+
+
+if __name__ == '__main__':
+    unittest.main()
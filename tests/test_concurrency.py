@@ -0,0 +1,83 @@
+"""Tests of the --adaptive-workers ConcurrencyController:  ramping up while throughput holds, backing off after errors
+or when the remote is saturated, and the limits on operations in flight.
+
+    python -m unittest discover tests
+"""
+import logging
+import threading
+import time
+import unittest
+
+from support import load_engine
+
+engine = load_engine()
+ConcurrencyController = engine['ConcurrencyController']
+
+
+class TestConcurrencyController(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.INFO)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def round(self, controller, name, nbytes=100, seconds=1.0, elapsed=1.0, errors=0):
+        """Run one round of operations on a remote, each copying nbytes in seconds, the round taking elapsed seconds.
+        Returns the remote's limit after it."""
+        w = controller.window(name)
+        n = max(2, w.limit)
+        for i in range(n):
+            windows = controller.acquire([name])
+            if i == n - 1:
+                w.started = time.time() - elapsed
+            controller.release(windows, 1 if i < errors else 0, seconds, nbytes, 0)
+        return w.limit
+
+    def test_ramp_up(self):
+        controller = ConcurrencyController(2, 6, {})
+        limits = [self.round(controller, 'remote') for _ in range(6)]
+        self.assertEqual(limits, [3, 4, 5, 6, 6, 6])     # Up by one a round while throughput holds, to --max-workers
+        self.assertEqual(controller.windows['remote'].peak, 6)
+
+    def test_back_off_on_errors(self):
+        controller = ConcurrencyController(8, 8, {})
+        limits = [self.round(controller, 'remote', errors=1) for _ in range(4)]
+        self.assertEqual(limits, [4, 2, 1, 1])          # Halved a round, down to one
+        self.assertEqual(self.round(controller, 'remote'), 2)
+        self.assertEqual(controller.windows['remote'].total_errors, 4)
+
+    def test_retries_count_as_errors(self):
+        controller = ConcurrencyController(4, 8, {})
+        windows = controller.acquire(['remote'])
+        controller.release(windows, 0, 1.0, 100, 2)
+        self.assertEqual(controller.windows['remote'].errors, 1)
+
+    def test_saturated(self):
+        controller = ConcurrencyController(4, 8, {})
+        self.assertEqual(self.round(controller, 'remote', nbytes=100, seconds=1.0), 5)
+        # Throughput well down and latency up:  one fewer
+        self.assertEqual(self.round(controller, 'remote', nbytes=10, seconds=2.0), 4)
+        # Throughput a little down:  held
+        self.assertEqual(self.round(controller, 'remote', nbytes=11, seconds=2.0), 4)
+
+    def test_remote_limits(self):
+        controller = ConcurrencyController(4, 8, {'slow': 2})
+        self.assertEqual(controller.window('slow').limit, 2)
+        self.assertEqual(controller.window('fast').limit, 4)
+        self.assertEqual([self.round(controller, 'slow') for _ in range(3)], [2, 2, 2])
+
+    def test_acquire_waits(self):
+        controller = ConcurrencyController(1, 1, {})
+        windows = controller.acquire(['remote'])
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(controller.acquire(['remote'])))
+        thread.daemon = True
+        thread.start()
+        thread.join(0.2)
+        self.assertEqual(acquired, [])                  # Blocked until the first operation is released
+        controller.release(windows, 0, 0.1, 0, 0)
+        thread.join(5)
+        self.assertEqual(len(acquired), 1)
+        self.assertEqual(controller.in_flight, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Tests of InotifyWatcher, the Linux inotify watch of Path1 for --journal and --watch:  changes reported as files and
+subtrees, and the watches re-added after the event queue overflows.
+
+    python -m unittest discover tests
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from support import load_engine
+
+engine = load_engine()
+
+MAX_QUEUED_EVENTS = '/proc/sys/fs/inotify/max_queued_events'
+
+
+@unittest.skipUnless(sys.platform.startswith('linux') and sys.version_info[0] >= 3, 'Linux inotify, Python 3')
+class TestInotifyWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='rclonesync_test_')
+        self.base = self.tmp + '/'
+        os.makedirs(self.base + 'sub')
+        self.touch('a.txt')
+        self.touch('sub/b.txt')
+        self.watcher = engine['InotifyWatcher'](self.base)
+
+    def tearDown(self):
+        self.watcher.close()
+        shutil.rmtree(self.tmp)
+
+    def touch(self, key, data=u'x'):
+        with io.open(self.base + key, 'w') as f:
+            f.write(data)
+
+    def read_all(self):
+        changes = []
+        while True:
+            read = self.watcher.read(timeout=0.2)
+            if not read:
+                return changes
+            changes.extend(read)
+
+    def test_files_and_subtrees(self):
+        self.touch('sub/b.txt', u'changed')
+        os.makedirs(self.base + 'new/deeper')
+        os.rename(self.base + 'sub', self.base + 'moved')
+        changes = self.read_all()
+        self.assertIn(('F', 'sub/b.txt'), changes)
+        self.assertIn(('D', 'new/'), changes)
+        self.assertIn(('D', 'sub/'), changes)
+        self.assertIn(('D', 'moved/'), changes)
+        # The new and the moved directories are watched where they now are
+        self.touch('new/deeper/c.txt')
+        self.touch('moved/b.txt', u'again')
+        changes = self.read_all()
+        self.assertIn(('F', 'new/deeper/c.txt'), changes)
+        self.assertIn(('F', 'moved/b.txt'), changes)
+        self.assertNotIn('sub/', self.watcher.wds)
+
+    def test_overflow_rescan(self):
+        if not os.path.exists(MAX_QUEUED_EVENTS):
+            self.skipTest('inotify queue size unknown')
+        with io.open(MAX_QUEUED_EVENTS) as f:
+            max_events = int(f.read())
+        # Alternating between two files, so the kernel can't merge the events, until the queue overflows
+        for n in range(max_events // 2 + 100):
+            os.utime(self.base + 'a.txt', None)
+            os.utime(self.base + 'sub/b.txt', None)
+        os.makedirs(self.base + 'unseen')           # Its creation event is lost
+        changes = self.read_all()
+        self.assertIn(('OVERFLOW', None), changes)
+        self.assertNotIn(('D', 'unseen/'), changes)
+        self.assertFalse(self.watcher.lost)
+        # The watches were re-added from a fresh walk of the tree, so the directory created unseen is watched
+        self.assertIn('unseen/', self.watcher.wds)
+        self.touch('unseen/c.txt')
+        self.assertIn(('F', 'unseen/c.txt'), self.read_all())
+
+    def test_base_deleted(self):
+        shutil.rmtree(self.tmp)
+        os.makedirs(self.tmp)                       # For tearDown
+        changes = self.read_all()
+        self.assertIn(('OVERFLOW', None), changes)
+        self.assertTrue(self.watcher.lost)
+
+
+if __name__ == '__main__':
+    unittest.main()
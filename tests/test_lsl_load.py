@@ -0,0 +1,34 @@
+"""Tests of rclone_lsl_load, loading the listings as rclone lsl emits them.
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+from support import SyncTestCase
+
+
+class TestLslLoad(SyncTestCase):
+    def setUp(self):
+        SyncTestCase.setUp(self)
+        for path in (self.path1, self.path2):
+            self.write(path, 'a.txt', u'a')
+        returncode, output = self.run_sync('--first-sync')
+        self.assertEqual(returncode, 0, output)
+
+    @unittest.skipUnless(sys.platform.startswith('linux') and sys.version_info[0] >= 3, 'Non UTF-8 file names')
+    def test_decode_error_not_retried(self):
+        with open(os.path.join(os.fsencode(self.path2), b'bad\xff.txt'), 'wb') as f:
+            f.write(b'x')
+        returncode, output = self.run_sync('--verbose')
+        self.assertNotEqual(returncode, 0, output)
+        self.assertIn('Exception in rclone_lsl_load', output)
+        self.assertIn('Failed loading current Path2 list file', output)
+        self.assertNotIn('try 1 failed', output)
+        lsl_calls = [call for call in self.rclone_calls('lsl') if call[1] == self.path2 + '/']
+        self.assertEqual(len(lsl_calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
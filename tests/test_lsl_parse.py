@@ -0,0 +1,90 @@
+"""Tests of the rclone lsl line parser (parse_lsl_line, hour_epoch):  fractions, odd keys, and local times around DST
+changes (US Eastern time).
+
+    python -m unittest discover tests
+"""
+import os
+import time
+import unittest
+
+from support import load_engine
+
+engine = load_engine()
+parse_lsl_line = engine['parse_lsl_line']
+
+EASTERN = 'EST5EDT,M3.2.0,M11.1.0'                  # POSIX rule, so no tz database is needed
+
+
+class LslTestCase(unittest.TestCase):
+    def setUp(self):
+        if not hasattr(time, 'tzset'):
+            self.skipTest('time.tzset() is Unix only')
+        self.tz = os.environ.get('TZ')
+        os.environ['TZ'] = EASTERN
+        time.tzset()
+        engine['_hour_epochs'].clear()              # Cached per local time zone
+
+    def tearDown(self):
+        if self.tz is None:
+            del os.environ['TZ']
+        else:
+            os.environ['TZ'] = self.tz
+        time.tzset()
+        engine['_hour_epochs'].clear()
+
+    def datetime(self, line):
+        return parse_lsl_line(line)[2]
+
+
+class TestParseLslLine(LslTestCase):
+    def test_fast_path(self):
+        self.assertEqual(parse_lsl_line('  3009805 2019-06-21 11:04:05.123456789 music/12 - Wait.mp3\n'),
+                         ('music/12 - Wait.mp3', '3009805', 1561129445123456789))
+
+    def test_matches_mktime(self):
+        for line in ('1 2019-01-01 00:00:00.000000000 a', '1 2019-12-31 23:59:59.999999999 a', '1 2020-02-29 12:30:45.000000001 a'):
+            date, clock = line.split()[1:3]
+            expected = int(time.mktime(time.strptime(date + ' ' + clock[:8], '%Y-%m-%d %H:%M:%S'))) * 10**9 + int(clock[9:])
+            self.assertEqual(self.datetime(line), expected)
+
+    def test_short_fractions(self):
+        # Not rclone's fixed layout:  parsed by LINE_FORMAT, the fraction taken as the leading digits of the ns
+        whole = self.datetime('1 2019-06-21 11:04:05.000000000 a')
+        self.assertEqual(self.datetime('1 2019-06-21 11:04:05.5 a'), whole + 500000000)
+        self.assertEqual(self.datetime('1 2019-06-21 11:04:05.000001 a'), whole + 1000)
+        self.assertEqual(self.datetime('1 2019-06-21 11:04:05.000000001 a'), whole + 1)
+
+    def test_keys(self):
+        self.assertEqual(parse_lsl_line('        0 2019-06-21 11:04:05.000000000  leading space')[0], ' leading space')
+        self.assertEqual(parse_lsl_line('        0 2019-06-21 11:04:05.000000000 two  spaces ')[0], 'two  spaces ')
+        self.assertEqual(parse_lsl_line(u'        0 2019-06-21 11:04:05.000000000 \xe9t\xe9/caf\xe9\n')[0], u'\xe9t\xe9/caf\xe9')
+
+    def test_malformed(self):
+        for line in ('', '\n', 'total 12', '-1 2019-06-21 11:04:05.000000000 gdoc', '12 2019-06-21 a.txt', '12 21/06/2019 11:04:05.0 a'):
+            self.assertIsNone(parse_lsl_line(line), line)
+
+
+class TestHourEpoch(LslTestCase):
+    def test_spring_forward(self):
+        # 2021-03-14 02:00 EST doesn't exist:  01:59:59 EST is followed by 03:00:00 EDT
+        before = self.datetime('1 2021-03-14 01:59:59.500000000 a')
+        after = self.datetime('1 2021-03-14 03:00:00.000000000 a')
+        self.assertEqual(before, 1615705199500000000)
+        self.assertEqual(after - before, 500000000)
+
+    def test_fall_back(self):
+        # 2021-11-07 01:00-02:00 is repeated:  00:59:59 EDT is 2 hours and 1 second before 02:00:00 EST
+        before = self.datetime('1 2021-11-07 00:59:59.000000000 a')
+        after = self.datetime('1 2021-11-07 02:00:00.000000000 a')
+        self.assertEqual(after, 1636268400 * 10**9)
+        self.assertEqual(after - before, 7201 * 10**9)
+
+    def test_cached_per_hour(self):
+        self.datetime('1 2019-06-21 11:04:05.000000000 a')
+        self.datetime('1 2019-06-21 11:59:59.000000000 b')
+        self.datetime('1 2019-06-21 12:00:00.000000000 c')
+        self.assertEqual(sorted(engine['_hour_epochs']), ['2019-06-2111', '2019-06-2112'])
+
+
+if __name__ == '__main__':
+    unittest.main()
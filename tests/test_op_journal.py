@@ -0,0 +1,108 @@
+"""Tests of resuming a killed run from its operation journal (OpJournal).
+
+    python -m unittest discover tests
+"""
+import io
+import json
+import os
+import unittest
+
+from support import SyncTestCase, load_engine
+
+engine = load_engine()
+OpJournal = engine['OpJournal']
+
+NEW = ['n1.txt', 'n2.txt', 'n3.txt', 'n4.txt', 'n5.txt']
+
+
+class TestResume(SyncTestCase):
+    def setUp(self):
+        SyncTestCase.setUp(self)
+        for path in (self.path1, self.path2):
+            self.write(path, 'a.txt', u'a')
+        returncode, output = self.run_sync('--first-sync')
+        self.assertEqual(returncode, 0, output)
+        for key in NEW:
+            self.write(self.path2, key, u'new ' + key, age=60)
+        self.journal = [os.path.join(self.workdir, name) for name in os.listdir(self.workdir) if name.endswith('_Path1')][0][:-6] + '_OPS'
+
+    def journal_records(self):
+        with io.open(self.journal, encoding='utf8') as f:
+            return [json.loads(line) for line in f]
+
+    def copied(self):
+        return sorted(os.path.basename(call[-3]) for call in self.rclone_calls('copyto'))
+
+    def test_resume_after_kill(self):
+        # With one worker, Path2's new files are copied to Path1 in order, and the run is killed by n3.txt's rclone,
+        # which still copies it (as an rclone left running does)
+        returncode, output = self.run_sync('--workers', '1', RCLONE_STANDIN_KILL='n3.txt')
+        self.assertEqual(returncode, -9, output)
+        self.remove_lock()
+        self.assertEqual(self.files(self.path1), ['a.txt', 'n1.txt', 'n2.txt', 'n3.txt'])
+
+        # Each planned operation is journaled, and the completed ones' DONE records written despite their batched fsync
+        records = self.journal_records()
+        planned = dict((record['plan'], record['effects'][0][1]) for record in records if 'plan' in record)
+        self.assertEqual(sorted(planned.values()), NEW)
+        done = [planned[record['done']] for record in records if 'done' in record]
+        self.assertEqual(done, ['n1.txt', 'n2.txt'])
+
+        # The rerun copies just the files still pending.  n1.txt and n2.txt are journaled done, and n3.txt is found done,
+        # so none is seen as new on both paths.
+        returncode, output = self.run_sync('--workers', '1', '--verbose')
+        self.assertEqual(returncode, 0, output)
+        self.assertIn('2 of 5 planned operation(s) completed, 1 more found done', output)
+        self.assertEqual(self.copied(), ['n4.txt', 'n5.txt'])
+        self.assertEqual(self.files(self.path1), ['a.txt'] + NEW)
+        self.assertEqual(self.files(self.path2), ['a.txt'] + NEW)
+        self.assertFalse(os.path.exists(self.journal))
+
+        returncode, output = self.run_sync()
+        self.assertEqual(returncode, 0, output)
+        self.assertEqual(self.rclone_calls('copyto'), [])
+
+
+class TestOpJournal(SyncTestCase):
+    def test_done_records_batched(self):
+        self.addCleanup(engine.__setitem__, 'JOURNAL_SYNC_INTERVAL', engine['JOURNAL_SYNC_INTERVAL'])
+        engine['JOURNAL_SYNC_INTERVAL'] = 3600      # No fsync but sync()'s
+        journal_file = os.path.join(self.tmp, 'ops')
+        journal = OpJournal(journal_file)
+        entry = (3, 1561122245000000000)
+        ids = journal.plan_ops([('copyto', [((1, 2), 'a.txt', entry)]), ('delete', [((1, 2), 'b.txt', None)])])
+        journal.op_done(ids[0])
+        journal.op_done(ids[1], failed=['b.txt'])
+        self.assertTrue(journal.dirty)             # Flushed, not yet fsync'ed
+        journal.sync()
+        self.assertFalse(journal.dirty)
+
+        # Read back by another instance, as by a rerun, before this one is closed
+        resumed = OpJournal(journal_file)
+        self.assertEqual(resumed.completed, {ids[0]: set(), ids[1]: {'b.txt'}})
+        updates, completed, found = resumed.resume({}, {})
+        self.assertEqual((completed, found), (2, 0))
+        self.assertEqual(updates, {1: {'a.txt': entry}, 2: {'a.txt': entry}})
+        journal.close()
+
+    def test_found_done_and_torn_line(self):
+        journal_file = os.path.join(self.tmp, 'ops')
+        journal = OpJournal(journal_file)
+        entry = (3, 1561122245000000000)
+        journal.plan_ops([('copyto', [((1, 2), 'a.txt', entry)]), ('copyto', [((1, 2), 'b.txt', entry)])])
+        journal.close()
+        with io.open(journal_file, 'ab') as f:
+            f.write(b'{"done": 1')                 # Torn by a crash
+        resumed = OpJournal(journal_file)
+        self.assertEqual(resumed.completed, {})
+        # a.txt is on both paths as planned, b.txt only on Path1
+        updates, completed, found = resumed.resume({'a.txt': entry, 'b.txt': entry}, {'a.txt': entry})
+        self.assertEqual((completed, found), (0, 1))
+        self.assertEqual(updates, {1: {'a.txt': entry}, 2: {'a.txt': entry}})
+        resumed.op_done(1)
+        resumed.close()
+        self.assertEqual(OpJournal(journal_file).completed, {1: set()})
+
+
+if __name__ == '__main__':
+    unittest.main()
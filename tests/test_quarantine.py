@@ -0,0 +1,52 @@
+"""Tests of --continue-on-error:  failed rclone operations quarantined, retried once, and re-detected on the next run.
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from support import SyncTestCase
+
+
+class TestQuarantine(SyncTestCase):
+    def setUp(self):
+        SyncTestCase.setUp(self)
+        for path in (self.path1, self.path2):
+            self.write(path, 'a.txt', u'a')
+        returncode, output = self.run_sync('--first-sync')
+        self.assertEqual(returncode, 0, output)
+
+    def copies(self, key):
+        return [call for call in self.rclone_calls('copyto') if any(arg.endswith('/' + key) for arg in call)]
+
+    def test_failed_again_not_retried_after_sync(self):
+        # Path2's new file fails to copy to Path1, and again when retried.  It's left for the next run, not retried
+        # once more after the sync phase, which would copy it with its key still quarantined.
+        self.write(self.path2, 'new.txt', u'new', age=60)
+        returncode, output = self.run_sync('--continue-on-error', RCLONE_STANDIN_FAIL='new.txt', RCLONE_STANDIN_FAIL_TIMES='2')
+        self.assertEqual(returncode, 1, output)
+        self.assertIn('1 file(s) quarantined', output)
+        self.assertEqual(len(self.copies('new.txt')), 2, output)
+        self.assertFalse(os.path.exists(os.path.join(self.path1, 'new.txt')))
+
+        returncode, output = self.run_sync('--continue-on-error')
+        self.assertEqual(returncode, 0, output)
+        self.assertEqual(len(self.copies('new.txt')), 1, output)
+        self.assertEqual(self.files(self.path1), ['a.txt', 'new.txt'])
+        self.assertEqual(self.files(self.path2), ['a.txt', 'new.txt'])
+
+    def test_retry_succeeds(self):
+        self.write(self.path2, 'new.txt', u'new', age=60)
+        returncode, output = self.run_sync('--continue-on-error', RCLONE_STANDIN_FAIL='new.txt', RCLONE_STANDIN_FAIL_TIMES='1')
+        self.assertEqual(returncode, 0, output)
+        self.assertNotIn('quarantined', output)
+        self.assertEqual(len(self.copies('new.txt')), 2, output)
+        self.assertEqual(self.files(self.path1), ['a.txt', 'new.txt'])
+
+        returncode, output = self.run_sync()
+        self.assertEqual(returncode, 0, output)
+        self.assertEqual(self.rclone_calls('copyto'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
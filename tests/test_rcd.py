@@ -0,0 +1,180 @@
+"""Tests of the --rcd client (RcdClient, RcdJob, rc_list_lsl) against a stand-in rclone rcd HTTP server.
+
+    python -m unittest discover tests
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import unittest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:                                 # Py2.7
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'source', 'rclonesync')
+engine = {'__name__': 'rclonesync'}
+exec(compile(open(ENGINE).read(), ENGINE, 'exec'), engine)
+RcdClient, RcdJob, RcdError = engine['RcdClient'], engine['RcdJob'], engine['RcdError']
+
+AUTH = 'Basic dXNlcjpwYXNz'                          # user:pass
+
+
+class StandInRcd(HTTPServer):
+    """Answers the rc calls rclonesync makes, as rclone rcd would.  Async jobs finish after job_polls job/status calls,
+    and self.calls records the (method, params) of each call."""
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StandInHandler)
+        self.calls = []
+        self.jobs = {}
+        self.job_polls = 3
+        self.listing = []
+
+    def rc(self, method, params):
+        self.calls.append((method, params))
+        if method == 'rc/noop':
+            return 200, params
+        if method == 'core/stats':
+            return 200, {'bytes': 0, 'checks': len(self.calls), 'transfers': 0, 'errors': 0}
+        if method == 'job/status':
+            job = self.jobs[params['jobid']]
+            job['polls'] += 1
+            finished = job['stopped'] or job['polls'] >= self.job_polls
+            return 200, {'id': params['jobid'], 'finished': finished, 'success': finished and not job['stopped'],
+                         'error': 'context canceled' if job['stopped'] else '', 'output': job['output'] if finished else None}
+        if method == 'job/stop':
+            self.jobs[params['jobid']]['stopped'] = True
+            return 200, {}
+        if method == 'operations/list':
+            output = {'list': self.listing}
+        elif method == 'operations/fail':
+            return 500, {'error': 'directory not found', 'status': 500}
+        else:
+            return 404, {'error': 'couldn\'t find method "{}"'.format(method), 'status': 404}
+        if params.get('_async'):
+            jobid = len(self.jobs) + 1
+            self.jobs[jobid] = {'polls': 0, 'stopped': False, 'output': output}
+            return 200, {'jobid': jobid}
+        return 200, output
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        params = json.loads(self.rfile.read(int(self.headers['Content-Length'])).decode('utf8'))
+        if self.headers.get('Authorization') != AUTH:
+            code, result = 401, {'error': 'authentication required'}
+        else:
+            code, result = self.server.rc(self.path.lstrip('/'), params)
+        body = json.dumps(result).encode('utf8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class RcdTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInRcd()
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05})
+        self.thread.daemon = True
+        self.thread.start()
+        self.rcd = RcdClient('rclone', 'rclone.conf', url='http://127.0.0.1:{}'.format(self.server.server_port),
+                             user='user', password='pass')
+
+    def tearDown(self):
+        self.rcd.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestRcdClient(RcdTestCase):
+    def test_connects_with_noop(self):
+        self.assertEqual(self.server.calls, [('rc/noop', {})])
+        self.assertTrue(self.rcd.url.endswith('/'))
+
+    def test_call(self):
+        self.assertEqual(self.rcd.call('rc/noop', {'a': 1}), {'a': 1})
+
+    def test_error_message(self):
+        with self.assertRaises(RcdError) as cm:
+            self.rcd.call('operations/fail', {'fs': 'remote:'})
+        self.assertEqual(str(cm.exception), 'directory not found')
+
+    def test_bad_credentials(self):
+        self.rcd.auth = 'Basic Ym9ndXM6Ym9ndXM='
+        with self.assertRaises(RcdError):
+            self.rcd.call('rc/noop')
+
+    def test_unreachable(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        with self.assertRaises((IOError, OSError)):
+            RcdClient('rclone', 'rclone.conf', url='http://127.0.0.1:{}/'.format(port))
+
+
+class TestRcdJob(RcdTestCase):
+    def test_wait(self):
+        self.server.listing = [{'Path': 'a.txt', 'Size': 1, 'ModTime': '2019-06-21T15:04:05.5Z'}]
+        job = RcdJob(self.rcd, 'operations/list', {'fs': 'remote:', 'remote': ''})
+        self.assertEqual(self.server.calls[-1], ('operations/list', {'fs': 'remote:', 'remote': '', '_async': True}))
+        self.assertIsNone(job.poll())
+        self.assertEqual(job.wait(), {'list': self.server.listing})
+        self.assertEqual(job.poll(), 0)
+        self.assertEqual(self.server.jobs[job.jobid]['polls'], self.server.job_polls)
+
+    def test_progress(self):
+        job = RcdJob(self.rcd, 'operations/list')
+        first, second = job.progress(), job.progress()
+        self.assertEqual(len(first), len(engine['JsonLogProgress'].STATS_COUNTS))
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.server.calls[-1], ('core/stats', {'group': 'job/{}'.format(job.jobid)}))
+
+    def test_terminate(self):
+        job = RcdJob(self.rcd, 'operations/list')
+        job.terminate()
+        self.assertEqual(job.poll(), 1)
+        with self.assertRaises(RcdError) as cm:
+            job.wait()
+        self.assertEqual(str(cm.exception), 'context canceled')
+
+    def test_start_error(self):
+        with self.assertRaises(RcdError):
+            RcdJob(self.rcd, 'operations/fail')
+
+
+class TestRcdExitCode(unittest.TestCase):
+    def test_exit_codes(self):
+        rcd_exit_code = engine['rcd_exit_code']
+        self.assertEqual(rcd_exit_code(RcdError('directory not found')), 3)
+        self.assertEqual(rcd_exit_code(RcdError('object not found')), 4)
+        # Any other error is uncategorised, as rclone's exit code 1, and not retried
+        self.assertEqual(rcd_exit_code(RcdError('failed to open source object: permission denied')), 1)
+        self.assertEqual(engine['RCLONE_EXIT_CODES'][1][0], engine['EXIT_NO_RETRY'])
+
+
+class TestRcListLsl(unittest.TestCase):
+    def test_listing(self):
+        lsl = engine['rc_list_lsl']([{'Path': 'b/c.txt', 'Size': 12, 'ModTime': '2019-06-21T15:04:05.123456789+02:00'},
+                                     {'Path': 'a.txt', 'Size': 0, 'ModTime': '2019-06-21T13:04:05Z'}], 'remote:')
+        self.assertEqual(lsl.keys, ['b/c.txt', 'a.txt'])
+        self.assertEqual(list(lsl.sizes), [12, 0])
+        self.assertEqual(list(lsl.datetimes), [1561122245123456789, 1561122245000000000])
+
+    def test_skips_unknown_size(self):
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        lsl = engine['rc_list_lsl']([{'Path': 'doc.gdoc', 'Size': -1, 'ModTime': '2019-06-21T13:04:05Z'},
+                                     {'Path': 'a.txt', 'Size': 3, 'ModTime': '2019-06-21T13:04:05Z'}], 'remote:')
+        self.assertEqual(lsl.keys, ['a.txt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Tests of the renames found on one path (find_renames) being made on the other path with rclone moveto.
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from support import SyncTestCase
+
+
+class TestRenames(SyncTestCase):
+    def setUp(self):
+        SyncTestCase.setUp(self)
+        for path in (self.path1, self.path2):
+            for n in range(6):                      # Keeps the deletes of the tests under --max-deletes
+                self.write(path, 'f{}.txt'.format(n), u'f{}'.format(n))
+            self.write(path, 'a.txt', u'aaa')
+            self.write(path, 'x.txt', u'xx')
+            self.write(path, 'y.txt', u'yy')        # Same size and modtime as x.txt
+        returncode, output = self.run_sync('--first-sync')
+        self.assertEqual(returncode, 0, output)
+
+    def rename(self, path, old, new):
+        os.rename(os.path.join(path, old), os.path.join(path, new))
+
+    def assert_synced(self, files):
+        for path in (self.path1, self.path2):
+            self.assertEqual([key for key in self.files(path) if not key.startswith('f')], files)
+        for key in files:
+            self.assertEqual(self.read(self.path1, key), self.read(self.path2, key))
+        returncode, output = self.run_sync('--verbose')
+        self.assertEqual(returncode, 0, output)
+        self.assertIn('No changes on Path1 or Path2', output)
+
+    def transfers(self):
+        return [call[0] for call in self.rclone_calls() if call[0] in ('copyto', 'copy', 'moveto', 'delete', 'sync')]
+
+    def test_unique_match(self):
+        self.rename(self.path1, 'a.txt', 'b.txt')
+        returncode, output = self.run_sync('--verbose')
+        self.assertEqual(returncode, 0, output)
+        self.assertIn('File was renamed to', output)
+        moves = self.rclone_calls('moveto')
+        self.assertEqual([call[-4:-2] for call in moves], [[self.path2 + '/a.txt', self.path2 + '/b.txt']])
+        self.assertEqual(self.transfers(), ['moveto'])      # Nothing copied or deleted
+        self.assert_synced(['b.txt', 'x.txt', 'y.txt'])
+        self.assertEqual(self.read(self.path2, 'b.txt'), u'aaa')
+
+    def test_unique_match_on_path2(self):
+        self.write(self.path2, 'sub/a.txt', u'aaa')
+        os.remove(os.path.join(self.path2, 'a.txt'))
+        os.utime(os.path.join(self.path2, 'sub/a.txt'), (self.mtime, self.mtime))
+        returncode, output = self.run_sync()
+        self.assertEqual(returncode, 0, output)
+        self.assertEqual([call[-4:-2] for call in self.rclone_calls('moveto')], [[self.path1 + '/a.txt', self.path1 + '/sub/a.txt']])
+        self.assertEqual(self.transfers(), ['moveto'])
+        self.assert_synced(['sub/a.txt', 'x.txt', 'y.txt'])
+
+    def test_ambiguous_falls_back_to_copy_and_delete(self):
+        # x.txt and y.txt can't be told apart by size and modtime, so their renames aren't paired
+        self.rename(self.path1, 'x.txt', 'x2.txt')
+        self.rename(self.path1, 'y.txt', 'y2.txt')
+        returncode, output = self.run_sync()
+        self.assertEqual(returncode, 0, output)
+        self.assertEqual(self.rclone_calls('moveto'), [])
+        self.assertEqual(sorted(self.transfers()), ['copy', 'delete'])     # One batch of each
+        self.assert_synced(['a.txt', 'x2.txt', 'y2.txt'])
+        self.assertEqual(self.read(self.path2, 'x2.txt'), u'xx')
+        self.assertEqual(self.read(self.path2, 'y2.txt'), u'yy')
+
+    def test_renamed_on_one_side_changed_on_other(self):
+        # a.txt renamed on Path1 and changed on Path2:  not paired, so that Path2's change isn't moved over or lost
+        self.rename(self.path1, 'a.txt', 'b.txt')
+        self.write(self.path2, 'a.txt', u'changed', age=60)
+        returncode, output = self.run_sync()
+        self.assertEqual(returncode, 0, output)
+        self.assertEqual(self.rclone_calls('moveto'), [])
+        self.assert_synced(['a.txt', 'b.txt', 'x.txt', 'y.txt'])
+        self.assertEqual(self.read(self.path1, 'a.txt'), u'changed')
+        self.assertEqual(self.read(self.path2, 'b.txt'), u'aaa')
+
+
+if __name__ == '__main__':
+    unittest.main()
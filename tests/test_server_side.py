@@ -0,0 +1,49 @@
+"""Tests of copies between two remotes being made server-side only when rclone can:  the same remote, or remotes of the
+same backend type that allow --server-side-across-configs.
+
+    python -m unittest discover tests
+"""
+import json
+import unittest
+
+from support import SyncTestCase
+
+
+class TestServerSide(SyncTestCase):
+    def sync(self, path1_remote, path2_remote, across=True):
+        remotes = {'drive1': {'type': 'drive', 'root': self.path1, 'across': across},
+                   'drive2': {'type': 'drive', 'root': self.path2, 'across': across},
+                   's3': {'type': 's3', 'root': self.path2, 'across': across}}
+        self.sync_paths = [path1_remote + ':', path2_remote + ':']
+        env = {'RCLONE_STANDIN_REMOTES': json.dumps(remotes)}
+        for path in (self.path1, self.path2):
+            self.write(path, 'a.txt', u'a')
+        returncode, output = self.run_sync('--first-sync', **env)
+        self.assertEqual(returncode, 0, output)
+        self.write(self.path1, 'new.txt', u'new', age=60)
+        returncode, output = self.run_sync('--verbose', **env)
+        self.assertEqual(returncode, 0, output)
+        self.assertEqual(self.read(self.path2, 'new.txt'), u'new')
+        return output, self.rclone_calls('copy')
+
+    def test_same_type_across_configs(self):
+        output, copies = self.sync('drive1', 'drive2')
+        self.assertIn('Path1 and Path2 are on the same backend - copying between them server-side', output)
+        self.assertIn('--server-side-across-configs', copies[0])
+        self.assertIn('1 file(s) copied between Path1 and Path2 server-side', output)
+
+    def test_different_types(self):
+        output, copies = self.sync('drive1', 's3')
+        self.assertNotIn('same backend', output)
+        self.assertIn('downloaded and uploaded (different backends (drive and s3))', output)
+        self.assertNotIn('--server-side-across-configs', copies[0])
+
+    def test_same_type_not_allowed(self):
+        output, copies = self.sync('drive1', 'drive2', across=False)
+        self.assertNotIn('same backend', output)
+        self.assertIn("different remotes that don't allow copies between them", output)
+        self.assertNotIn('--server-side-across-configs', copies[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
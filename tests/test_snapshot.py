@@ -0,0 +1,101 @@
+"""Tests of the binary snapshot format of the prior listings (save_snapshot, SnapshotFile):  round trips between rclone
+lsl text list files, binary snapshots and their mmap'ed views, and damaged files.
+
+    python -m unittest discover tests
+"""
+import io
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from support import load_engine
+
+engine = load_engine()
+LslList, SnapshotFile, save_snapshot, load_list = engine['LslList'], engine['SnapshotFile'], engine['save_snapshot'], engine['load_list']
+
+LSL = u'''     1234 2019-06-21 11:04:05.123456789 b/c.txt
+        0 2019-06-21 11:04:05.000000000 a.txt
+  3009805 2013-09-16 04:13:50.000000000 music/12 - Wait.mp3
+       12 2017-06-19 21:23:28.610000000 \xe9t\xe9/caf\xe9
+'''
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='rclonesync_test_')
+        self.text_file = os.path.join(self.tmp, 'LSL_Path1')
+        with io.open(self.text_file, 'w', encoding='utf8') as f:
+            f.write(LSL)
+        status, self.lsl = load_list(self.text_file)
+        self.assertEqual(status, 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def assert_same(self, lsl, expected):
+        self.assertEqual(lsl.keys, expected.keys)
+        self.assertEqual(list(lsl.sizes), list(expected.sizes))
+        self.assertEqual(list(lsl.datetimes), list(expected.datetimes))
+
+    def test_text_binary_text(self):
+        binary_file = os.path.join(self.tmp, 'LSL_Path1_BIN')
+        self.assertEqual(engine['convert_list_file'](self.text_file, binary_file), 0)
+        self.assertTrue(engine['is_snapshot'](binary_file))
+        self.assertFalse(engine['is_snapshot'](self.text_file))
+        status, lsl = load_list(binary_file)
+        self.assertEqual(status, 0)
+        self.assert_same(lsl, self.lsl)
+        self.assertEqual(lsl.keys, ['a.txt', 'b/c.txt', 'music/12 - Wait.mp3', u'\xe9t\xe9/caf\xe9'])
+        self.assertEqual(lsl.get('b/c.txt')[0], 1234)
+
+        text_file = os.path.join(self.tmp, 'LSL_Path1_TEXT')
+        engine['write_lsl'](lsl, text_file)
+        status, lsl = load_list(text_file)
+        self.assert_same(lsl, self.lsl)
+
+    def test_mmap_view(self):
+        binary_file = os.path.join(self.tmp, 'snapshot')
+        save_snapshot(self.lsl, binary_file)
+        snapshot = SnapshotFile(binary_file)
+        try:
+            self.assertEqual(len(snapshot), 4)
+            self.assertEqual([snapshot.key(i) for i in range(len(snapshot))], self.lsl.keys)
+            self.assert_same(snapshot.to_list(), self.lsl)
+            self.assertEqual(snapshot.hashes(), {})
+        finally:
+            snapshot.close()
+
+    def test_hashes(self):
+        binary_file = os.path.join(self.tmp, 'snapshot')
+        digest = b'\x01' * 16
+        entry = self.lsl.get('a.txt')
+        hashes = {'a.txt': entry + (digest,), 'b/c.txt': (1, 2, b'\x02' * 16)}   # b/c.txt's hash is for an older version
+        save_snapshot(self.lsl, binary_file, engine['hash_column'](self.lsl, hashes))
+        self.assertEqual(engine['load_hashes'](binary_file), {'a.txt': entry + (digest,)})
+        self.assertEqual(engine['load_hashes'](self.text_file), {})
+
+    def test_empty(self):
+        binary_file = os.path.join(self.tmp, 'snapshot')
+        save_snapshot(LslList(), binary_file)
+        status, lsl = load_list(binary_file)
+        self.assertEqual((status, len(lsl)), (0, 0))
+
+    def test_damaged(self):
+        binary_file = os.path.join(self.tmp, 'snapshot')
+        save_snapshot(self.lsl, binary_file)
+        with io.open(binary_file, 'rb') as f:
+            data = bytearray(f.read())
+        for damaged in (data[:-1], data[:64] + bytearray([data[64] ^ 1]) + data[65:]):
+            with io.open(binary_file, 'wb') as f:
+                f.write(bytes(damaged))
+            with self.assertRaises(ValueError):
+                SnapshotFile(binary_file).close()
+        logging.disable(logging.ERROR)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.assertEqual(load_list(binary_file)[0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
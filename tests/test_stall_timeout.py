@@ -0,0 +1,39 @@
+"""Tests of --stall-timeout:  the temporary JSON log rclone writes its stats to, for the Watchdog to see its progress.
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from support import SyncTestCase
+
+
+class TestStallTimeout(SyncTestCase):
+    def setUp(self):
+        SyncTestCase.setUp(self)
+        for path in (self.path1, self.path2):
+            self.write(path, 'a.txt', u'a')
+        returncode, output = self.run_sync('--first-sync')
+        self.assertEqual(returncode, 0, output)
+
+    def logs_left(self):
+        return [name for name in os.listdir(self.workdir) if name.startswith('rclone_log_')]
+
+    def test_temp_logs_removed(self):
+        self.write(self.path2, 'new.txt', u'new', age=60)
+        returncode, output = self.run_sync('--stall-timeout', '60')
+        self.assertEqual(returncode, 0, output)
+        self.assertEqual(self.files(self.path1), ['a.txt', 'new.txt'])
+        self.assertEqual(self.logs_left(), [])
+
+    def test_temp_log_removed_if_rclone_not_run(self):
+        # After the listings rclone can't be run:  each copy fails before rclone starts, leaving no log behind
+        self.write(self.path2, 'new.txt', u'new', age=60)
+        returncode, output = self.run_sync('--stall-timeout', '60', '--workers', '1', RCLONE_STANDIN_UNRUNNABLE='lsl')
+        self.assertNotEqual(returncode, 0, output)
+        self.assertIn('not run', output)
+        self.assertEqual(self.logs_left(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
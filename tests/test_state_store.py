@@ -0,0 +1,86 @@
+"""Tests of the --state-store sqlite StateStore:  updates marked with the run that made them, and changed_since().
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from support import load_engine
+
+engine = load_engine()
+StateStore = engine['StateStore']
+
+A, A2, B = (1, 1561122245000000000), (2, 1561122305000000000), (3, 1561122245000000000)
+
+
+class TestStateStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='rclonesync_test_')
+        self.db_file = os.path.join(self.tmp, 'state.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def run_store(self, dry_run=False):
+        """A StateStore opened for a run, closed after the test."""
+        store = StateStore(self.db_file, '/path1/', '/path2/', dry_run)
+        store.begin_run()
+        return store
+
+    def first_run(self):
+        store = self.run_store()
+        store.update(1, [('a.txt', A), ('b.txt', B)])
+        store.update(2, [('a.txt', A), ('b.txt', B)])
+        store.close(0)
+
+    def test_update(self):
+        self.first_run()
+        store = self.run_store()
+        self.assertEqual(store.latest_run(), 1)
+        store.update(1, [('a.txt', A2), ('b.txt', None), ('c.txt', B)])
+        self.assertEqual(store.latest_run(), 2)
+        lsl = store.load(1)
+        self.assertEqual(lsl.keys, ['a.txt', 'c.txt'])
+        self.assertEqual((lsl.get('a.txt'), lsl.get('c.txt')), (A2, B))
+        self.assertEqual(store.load(2).keys, ['a.txt', 'b.txt'])
+        store.close(0)
+
+    def test_unchanged_update_adds_no_run(self):
+        self.first_run()
+        store = self.run_store()
+        store.update(1, [('a.txt', A), ('b.txt', B), ('gone.txt', None)])     # Already so
+        store.close(0)
+        store = self.run_store()
+        self.assertEqual(store.latest_run(), 1)
+        self.assertEqual(store.changed_since(1), [])
+        store.close()
+
+    def test_changed_since(self):
+        self.first_run()
+        store = self.run_store()
+        store.update(1, [('a.txt', A2), ('b.txt', None)])
+        store.update(2, [('a.txt', A2)])
+        store.close(0)
+        store = self.run_store()
+        self.assertEqual(store.changed_since(1), [(2, 1, 'a.txt') + A2, (2, 2, 'a.txt') + A2, (2, 1, 'b.txt', None, None)])
+        self.assertEqual(len(store.changed_since(0)), 4)
+        # A deleted file seen again is changed by the run that sees it
+        store.update(1, [('b.txt', B)])
+        self.assertEqual(store.changed_since(2), [(3, 1, 'b.txt') + B])
+        store.close(0)
+
+    def test_dry_run_rolled_back(self):
+        self.first_run()
+        store = self.run_store(dry_run=True)
+        store.update(1, [('a.txt', A2)])
+        store.close(0)
+        store = self.run_store()
+        self.assertEqual(store.latest_run(), 1)
+        self.assertEqual(store.load(1).get('a.txt'), A)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
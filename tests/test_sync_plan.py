@@ -0,0 +1,102 @@
+"""Tests of the targeted sync of Path1's changes to Path2 (rather than a full rclone sync), by kind of change.
+
+    python -m unittest discover tests
+"""
+import os
+import unittest
+
+from support import SyncTestCase
+
+FILES = ['keep.txt', 'changed1.txt', 'deleted1.txt', 'deleted1_changed2.txt', 'conflict.txt']
+
+
+class TestSyncPlan(SyncTestCase):
+    def setUp(self):
+        SyncTestCase.setUp(self)
+        for path in (self.path1, self.path2):
+            for n in range(8):                      # Keeps the deletes of the tests under --max-deletes
+                self.write(path, 'f{}.txt'.format(n), u'f{}'.format(n))
+            for key in FILES:
+                self.write(path, key, u'prior ' + key)
+        returncode, output = self.run_sync('--first-sync')
+        self.assertEqual(returncode, 0, output)
+
+        self.write(self.path1, 'new1.txt', u'path1 new1.txt', age=60)
+        self.write(self.path1, 'changed1.txt', u'path1 changed1.txt', age=60)
+        os.remove(os.path.join(self.path1, 'deleted1.txt'))
+        os.remove(os.path.join(self.path1, 'deleted1_changed2.txt'))
+        self.write(self.path1, 'conflict.txt', u'path1 conflict.txt', age=60)
+        self.write(self.path2, 'new2.txt', u'path2 new2.txt', age=60)
+        self.write(self.path2, 'deleted1_changed2.txt', u'path2 deleted1_changed2.txt', age=60)
+        self.write(self.path2, 'conflict.txt', u'path2 conflict.txt', age=120)
+
+    def listed(self, path):
+        return [key for key in self.files(path) if not key.startswith('f')]
+
+    def copied_to(self, path):
+        """The files copied to path one at a time."""
+        dests = [self.call_paths(call)[1] for call in self.rclone_calls('copyto')]
+        return sorted(os.path.relpath(dest, path) for dest in dests if dest.startswith(path + '/'))
+
+    def batches(self, cmd):
+        return [call for call in self.rclone_calls(cmd) if '--files-from' in call]
+
+    def test_decision_table(self):
+        returncode, output = self.run_sync('--verbose')
+        self.assertEqual(returncode, 0, output)
+        self.assertIn('Applying changes on Path1 to Path2', output)
+        self.assertEqual(self.rclone_calls('sync'), [])
+
+        # New and changed on Path1:  copied in one batch.  Deleted on Path1, unchanged on Path2:  deleted in one batch.
+        self.assertEqual(len(self.batches('copy')), 1)
+        self.assertEqual(len(self.batches('delete')), 1)
+        self.assertEqual(self.read(self.path2, 'new1.txt'), u'path1 new1.txt')
+        self.assertEqual(self.read(self.path2, 'changed1.txt'), u'path1 changed1.txt')
+        self.assertFalse(os.path.exists(os.path.join(self.path2, 'deleted1.txt')))
+        # Deleted on Path1 and changed on Path2, and new on Path2:  copied to Path1, not back to Path2
+        self.assertEqual(self.read(self.path1, 'deleted1_changed2.txt'), u'path2 deleted1_changed2.txt')
+        self.assertEqual(self.read(self.path1, 'new2.txt'), u'path2 new2.txt')
+        # Changed on both:  both versions on both paths, one at a time
+        self.assertEqual(self.copied_to(self.path2), ['conflict.txt_Path1', 'conflict.txt_Path2'])
+        self.assertEqual(self.copied_to(self.path1), ['conflict.txt_Path2', 'deleted1_changed2.txt', 'new2.txt'])
+
+        expected = ['changed1.txt', 'conflict.txt_Path1', 'conflict.txt_Path2', 'deleted1_changed2.txt', 'keep.txt', 'new1.txt', 'new2.txt']
+        for path in (self.path1, self.path2):
+            self.assertEqual(self.listed(path), expected)
+        self.assertEqual(self.read(self.path2, 'conflict.txt_Path1'), u'path1 conflict.txt')
+        self.assertEqual(self.read(self.path2, 'conflict.txt_Path2'), u'path2 conflict.txt')
+
+        returncode, output = self.run_sync('--verbose')
+        self.assertEqual(returncode, 0, output)
+        self.assertIn('No changes on Path1 or Path2', output)
+
+    def test_quarantined_keys_left_out(self):
+        # The conflict's operations fail, and new1.txt fails to copy to Path2:  neither is synced, and both are picked
+        # up again by the next run
+        returncode, output = self.run_sync('--continue-on-error', RCLONE_STANDIN_FAIL='conflict.txt,new1.txt')
+        self.assertEqual(returncode, 1, output)
+        self.assertIn('Quarantined                       - conflict.txt', output)
+        self.assertIn('Quarantined                       - new1.txt', output)
+        self.assertEqual(set(self.copied_to(self.path2)), {'new1.txt'})    # Just new1.txt retried, on its own
+        self.assertEqual(self.read(self.path2, 'conflict.txt'), u'path2 conflict.txt')
+        self.assertEqual(self.read(self.path2, 'changed1.txt'), u'path1 changed1.txt')
+        self.assertEqual(self.listed(self.path2), ['changed1.txt', 'conflict.txt', 'deleted1_changed2.txt', 'keep.txt', 'new2.txt'])
+
+        returncode, output = self.run_sync('--verbose')
+        self.assertEqual(returncode, 0, output)
+        expected = ['changed1.txt', 'conflict.txt_Path1', 'conflict.txt_Path2', 'deleted1_changed2.txt', 'keep.txt', 'new1.txt', 'new2.txt']
+        for path in (self.path1, self.path2):
+            self.assertEqual(self.listed(path), expected)
+
+    def test_full_sync(self):
+        returncode, output = self.run_sync('--full-sync')
+        self.assertEqual(returncode, 0, output)
+        self.assertEqual(len(self.rclone_calls('sync')), 1)
+        self.assertEqual(self.batches('copy'), [])
+        expected = ['changed1.txt', 'conflict.txt_Path1', 'conflict.txt_Path2', 'deleted1_changed2.txt', 'keep.txt', 'new1.txt', 'new2.txt']
+        for path in (self.path1, self.path2):
+            self.assertEqual(self.listed(path), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()